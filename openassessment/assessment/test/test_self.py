@@ -5,12 +5,15 @@ Tests for self-assessment API.
 
 import copy
 import datetime
-import pytz
+from django.utils.timezone import now, utc
 from openassessment.test_utils import CacheResetTest
 from submissions.api import create_submission
+from submissions.models import StudentItem
 from openassessment.assessment.api.self import (
     create_assessment, submitter_is_finished, get_assessment
 )
+from openassessment.assessment.models import Assessment, Rubric
+from openassessment.assessment.serializers import rubric_from_dict
 from openassessment.assessment.errors import SelfAssessmentRequestError
 
 
@@ -23,6 +26,10 @@ class TestSelfApi(CacheResetTest):
         'item_type': 'test_type'
     }
 
+    # A second student in the same item, whose submission is self-assessed
+    # once by the class fixture.
+    ASSESSED_STUDENT_ITEM = dict(STUDENT_ITEM, student_id=u'𝖆𝖘𝖘𝖊𝖘𝖘𝖊𝖉 𝖚𝖘𝖊𝖗')
+
     RUBRIC = {
         "criteria": [
             {
@@ -61,175 +68,144 @@ class TestSelfApi(CacheResetTest):
         u"arbitrary set of things over another."
     )
 
+    SCORED_AT = datetime.datetime(2014, 4, 1, tzinfo=utc)
+
+    # Expected values for an assessment made with OPTIONS_SELECTED
+    # ("clear" = 3 points, "very accurate" = 5 points, out of 5 + 5)
+    EXPECTED_ASSESSMENT = {
+        'points_earned': 8,
+        'points_possible': 10,
+        'feedback': OVERALL_FEEDBACK,
+        'score_type': u'SE',
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Create the submissions, rubric, and assessment shared by the class.
+
+        Each test still runs inside its own transaction, so any assessments
+        it creates are rolled back; only the class fixtures outlive a test.
+        Because the rubric already exists, creating an assessment finds it
+        by content hash instead of rebuilding its criteria and options.
+        """
+        super(TestSelfApi, cls).setUpClass()
+        cls.submission = create_submission(cls.STUDENT_ITEM, "Test answer")
+        cls.rubric = rubric_from_dict(cls.RUBRIC)
+
+        # Self-assess a second submission without overriding the scored_at
+        # timestamp, so it should be set to the current time.
+        cls.assessed_submission = create_submission(cls.ASSESSED_STUDENT_ITEM, "Test answer")
+        cls.before_assessed = now()
+        cls.assessment = create_assessment(
+            cls.assessed_submission['uuid'], cls.ASSESSED_STUDENT_ITEM['student_id'],
+            cls.OPTIONS_SELECTED, cls.CRITERION_FEEDBACK, cls.OVERALL_FEEDBACK, cls.RUBRIC,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Remove the shared fixtures so they don't leak into other test cases.
+        """
+        Assessment.objects.filter(submission_uuid=cls.assessed_submission['uuid']).delete()
+        Rubric.objects.filter(pk=cls.rubric.pk).delete()
+        StudentItem.objects.filter(
+            course_id=cls.STUDENT_ITEM['course_id'],
+            item_id=cls.STUDENT_ITEM['item_id'],
+        ).delete()
+        super(TestSelfApi, cls).tearDownClass()
+
     def test_create_assessment(self):
         # Initially, there should be no submission or self assessment
         self.assertEqual(get_assessment("5"), None)
 
-        # Create a submission to self-assess
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
         # Now there should be a submission, but no self-assessment
-        assessment = get_assessment(submission["uuid"])
+        assessment = get_assessment(self.submission["uuid"])
         self.assertIs(assessment, None)
-        self.assertFalse(submitter_is_finished(submission['uuid'], {}))
+        self.assertFalse(submitter_is_finished(self.submission['uuid'], {}))
 
         # Create a self-assessment for the submission
         assessment = create_assessment(
-            submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
+            self.submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
             self.OPTIONS_SELECTED, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-            scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
+            scored_at=self.SCORED_AT
         )
 
         # Self-assessment should be complete
-        self.assertTrue(submitter_is_finished(submission['uuid'], {}))
+        self.assertTrue(submitter_is_finished(self.submission['uuid'], {}))
 
         # Retrieve the self-assessment
-        retrieved = get_assessment(submission["uuid"])
+        retrieved = get_assessment(self.submission["uuid"])
 
         # Check that the assessment we created matches the assessment we retrieved
         # and that both have the correct values
-        self.assertItemsEqual(assessment, retrieved)
-        self.assertEqual(assessment['submission_uuid'], submission['uuid'])
-        self.assertEqual(assessment['points_earned'], 8)
-        self.assertEqual(assessment['points_possible'], 10)
-        self.assertEqual(assessment['feedback'], u'' + self.OVERALL_FEEDBACK)
-        self.assertEqual(assessment['score_type'], u'SE')
+        self._assert_same_assessment(assessment, retrieved)
+        self.assertEqual(assessment['submission_uuid'], self.submission['uuid'])
+        self.assertDictContainsSubset(self.EXPECTED_ASSESSMENT, assessment)
 
     def test_create_assessment_no_submission(self):
         # Attempt to create a self-assessment for a submission that doesn't exist
-        with self.assertRaises(SelfAssessmentRequestError):
-            create_assessment(
-                'invalid_submission_uuid', u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-                self.OPTIONS_SELECTED, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-                scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
-            )
+        self._assert_create_fails(submission_uuid='invalid_submission_uuid')
 
     def test_create_assessment_wrong_user(self):
-        # Create a submission
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
         # Attempt to create a self-assessment for the submission from a different user
-        with self.assertRaises(SelfAssessmentRequestError):
-            create_assessment(
-                'invalid_submission_uuid', u'another user',
-                self.OPTIONS_SELECTED, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-                scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
-            )
+        self._assert_create_fails(user_id=u'another user')
 
     def test_create_assessment_invalid_criterion_feedback(self):
-        # Create a submission
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
-        # Mutate the criterion feedback to not include all the appropriate criteria.
-        criterion_feedback = {"clarify": "not", "accurate": "sure"}
-
         # Attempt to create a self-assessment with criterion_feedback that do not match the rubric
-        with self.assertRaises(SelfAssessmentRequestError):
-            create_assessment(
-                submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-                self.OPTIONS_SELECTED, criterion_feedback, self.OVERALL_FEEDBACK, self.RUBRIC,
-                scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
-            )
+        self._assert_create_fails(criterion_feedback={"clarify": "not", "accurate": "sure"})
 
     def test_create_assessment_invalid_criterion(self):
-        # Create a submission
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
         # Mutate the selected option criterion so it does not match a criterion in the rubric
-        options = copy.deepcopy(self.OPTIONS_SELECTED)
+        options = dict(self.OPTIONS_SELECTED)
         options['invalid criterion'] = 'very clear'
 
         # Attempt to create a self-assessment with options that do not match the rubric
-        with self.assertRaises(SelfAssessmentRequestError):
-            create_assessment(
-                submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-                options, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-                scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
-            )
+        self._assert_create_fails(options_selected=options)
 
     def test_create_assessment_invalid_option(self):
-        # Create a submission
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
         # Mutate the selected option so the value does not match an available option
-        options = copy.deepcopy(self.OPTIONS_SELECTED)
+        options = dict(self.OPTIONS_SELECTED)
         options['clarity'] = 'invalid option'
 
         # Attempt to create a self-assessment with options that do not match the rubric
-        with self.assertRaises(SelfAssessmentRequestError):
-            create_assessment(
-                submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-                options, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-                scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
-            )
+        self._assert_create_fails(options_selected=options)
 
     def test_create_assessment_missing_criterion(self):
-        # Create a submission
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
         # Delete one of the criterion that's present in the rubric
-        options = copy.deepcopy(self.OPTIONS_SELECTED)
+        options = dict(self.OPTIONS_SELECTED)
         del options['clarity']
 
         # Attempt to create a self-assessment with options that do not match the rubric
-        with self.assertRaises(SelfAssessmentRequestError):
-            create_assessment(
-                submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-                options, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-                scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
-            )
+        self._assert_create_fails(options_selected=options)
 
     def test_create_assessment_timestamp(self):
-        # Create a submission to self-assess
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
-        # Record the current system clock time
-        before = datetime.datetime.utcnow().replace(tzinfo=pytz.utc)
-
-        # Create a self-assessment for the submission
-        # Do not override the scored_at timestamp, so it should be set to the current time
-        assessment = create_assessment(
-            submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-            self.OPTIONS_SELECTED, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-        )
-
-        # Retrieve the self-assessment
-        retrieved = get_assessment(submission["uuid"])
+        # Retrieve the self-assessment created by the class fixture
+        retrieved = get_assessment(self.assessed_submission["uuid"])
 
         # Expect that both the created and retrieved assessments have the same
-        # timestamp, and it's >= our recorded time.
-        self.assertEqual(assessment['scored_at'], retrieved['scored_at'])
-        self.assertGreaterEqual(assessment['scored_at'], before)
+        # timestamp, and it's >= the time recorded before it was created.
+        self.assertEqual(self.assessment['scored_at'], retrieved['scored_at'])
+        self.assertGreaterEqual(self.assessment['scored_at'], self.before_assessed)
 
     def test_create_multiple_self_assessments(self):
-        # Create a submission to self-assess
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
-        # Self assess once
-        assessment = create_assessment(
-            submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-            self.OPTIONS_SELECTED, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
+        # The class fixture has already self-assessed once, so
+        # attempting to self-assess again should raise an exception
+        self._assert_create_fails(
+            submission_uuid=self.assessed_submission['uuid'],
+            user_id=self.ASSESSED_STUDENT_ITEM['student_id'],
+            scored_at=None
         )
 
-        # Attempt to self-assess again, which should raise an exception
-        with self.assertRaises(SelfAssessmentRequestError):
-            create_assessment(
-                submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
-                self.OPTIONS_SELECTED, self.CRITERION_FEEDBACK, self.OVERALL_FEEDBACK, self.RUBRIC,
-            )
-
         # Expect that we still have the original assessment
-        retrieved = get_assessment(submission["uuid"])
-        self.assertItemsEqual(assessment, retrieved)
+        retrieved = get_assessment(self.assessed_submission["uuid"])
+        self._assert_same_assessment(self.assessment, retrieved)
 
     def test_is_complete_no_submission(self):
         # This submission uuid does not exist
         self.assertFalse(submitter_is_finished('abc1234', {}))
 
     def test_create_assessment_criterion_with_zero_options(self):
-        # Create a submission to self-assess
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
         # Modify the rubric to include a criterion with no options (only written feedback)
         rubric = copy.deepcopy(self.RUBRIC)
         rubric['criteria'].append({
@@ -238,14 +214,14 @@ class TestSelfApi(CacheResetTest):
             "options": []
         })
 
-        criterion_feedback = copy.deepcopy(self.CRITERION_FEEDBACK)
+        criterion_feedback = dict(self.CRITERION_FEEDBACK)
         criterion_feedback['feedback only'] = "This is the feedback for the Zero Option Criterion."
 
         # Create a self-assessment for the submission
         assessment = create_assessment(
-            submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
+            self.submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
             self.OPTIONS_SELECTED, criterion_feedback, self.OVERALL_FEEDBACK, rubric,
-            scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
+            scored_at=self.SCORED_AT
         )
 
         # The self-assessment should have set the feedback for
@@ -254,9 +230,6 @@ class TestSelfApi(CacheResetTest):
         self.assertEqual(assessment["parts"][2]["feedback"], u"This is the feedback for the Zero Option Criterion.")
 
     def test_create_assessment_all_criteria_have_zero_options(self):
-        # Create a submission to self-assess
-        submission = create_submission(self.STUDENT_ITEM, "Test answer")
-
         # Use a rubric with only criteria with no options (only written feedback)
         rubric = copy.deepcopy(self.RUBRIC)
         for criterion in rubric["criteria"]:
@@ -275,9 +248,9 @@ class TestSelfApi(CacheResetTest):
         overall_feedback = ""
 
         assessment = create_assessment(
-            submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
+            self.submission['uuid'], u'𝖙𝖊𝖘𝖙 𝖚𝖘𝖊𝖗',
             options_selected,  criterion_feedback, overall_feedback,
-            rubric, scored_at=datetime.datetime(2014, 4, 1).replace(tzinfo=pytz.utc)
+            rubric, scored_at=self.SCORED_AT
         )
 
         # The self-assessment should have set the feedback for
@@ -287,3 +260,45 @@ class TestSelfApi(CacheResetTest):
             self.assertEqual(
                 part["feedback"], u'I thought it was about as accurate as Scrubs is to the medical profession.'
             )
+
+    def _assert_same_assessment(self, first, second):
+        """
+        Assert that two serialized assessments describe the same assessment.
+
+        The serialized rubric links each option back to its criterion,
+        so the dicts contain reference cycles and can't be compared with `==`.
+        We compare the top-level fields that don't include the rubric instead.
+
+        Args:
+            first (dict): A serialized assessment.
+            second (dict): Another serialized assessment.
+
+        Returns:
+            None
+        """
+        for key in ['submission_uuid', 'scored_at', 'points_earned', 'points_possible', 'feedback', 'score_type']:
+            self.assertEqual(first[key], second[key])
+
+    def _assert_create_fails(self, **kwargs):
+        """
+        Assert that creating a self-assessment raises a request error.
+
+        Keyword Arguments:
+            Any of the `create_assessment` arguments.  These override the
+            defaults, which describe a valid self-assessment of the shared submission.
+
+        Returns:
+            None
+        """
+        params = {
+            'submission_uuid': self.submission['uuid'],
+            'user_id': self.STUDENT_ITEM['student_id'],
+            'options_selected': self.OPTIONS_SELECTED,
+            'criterion_feedback': self.CRITERION_FEEDBACK,
+            'overall_feedback': self.OVERALL_FEEDBACK,
+            'rubric_dict': self.RUBRIC,
+            'scored_at': self.SCORED_AT,
+        }
+        params.update(kwargs)
+        with self.assertRaises(SelfAssessmentRequestError):
+            create_assessment(**params)
@@ -6,10 +6,14 @@ Tests for openassessment data aggregation.
 import os.path
 from StringIO import StringIO
 import csv
+from django.conf import settings
 from django.core.management import call_command
+from django.test.utils import override_settings
 import ddt
+import mock
 from submissions import api as sub_api
 from openassessment.test_utils import TransactionCacheResetTest
+from openassessment.assessment.models import Assessment
 from openassessment.workflow import api as workflow_api
 from openassessment.data import CsvWriter
 
@@ -116,6 +120,41 @@ class CsvWriterTest(TransactionCacheResetTest):
             rows = content.split('\n')
             self.assertGreater(len(rows), 2)
 
+    def test_no_read_replica(self):
+        # The test settings don't configure a read replica,
+        # so queries should use the default database.
+        writer = CsvWriter(self._output_streams(CsvWriter.MODELS))
+        queryset = writer._use_read_replica(Assessment.objects.all())
+        self.assertEqual(queryset.db, 'default')
+
+    def test_use_read_replica(self):
+        # Configure a read replica, and expect queries to be routed to it.
+        # We only check the routing, so the replica is never connected to.
+        databases = dict(settings.DATABASES, read_replica=settings.DATABASES['default'])
+        with override_settings(DATABASES=databases):
+            writer = CsvWriter(self._output_streams(CsvWriter.MODELS))
+            queryset = writer._use_read_replica(Assessment.objects.all())
+            self.assertEqual(queryset.db, 'read_replica')
+
+    @mock.patch.object(sub_api, 'get_latest_score_for_submission')
+    @mock.patch.object(sub_api, 'get_submission_and_student')
+    def test_submissions_read_from_replica(self, mock_get_submission, mock_get_score):
+        mock_get_submission.return_value = {
+            'uuid': 'test-uuid',
+            'student_item': {'student_id': 'test student', 'item_id': 'test item'},
+            'submitted_at': '2014-01-01',
+            'created_at': '2014-01-01',
+            'answer': 'test answer',
+        }
+        mock_get_score.return_value = None
+
+        writer = CsvWriter(self._output_streams(['submission', 'score']))
+        writer._write_submission_to_csv('test-uuid')
+
+        # Submissions data should be requested from the read replica
+        mock_get_submission.assert_called_once_with('test-uuid', read_replica=True)
+        mock_get_score.assert_called_once_with('test-uuid', read_replica=True)
+
     def _output_streams(self, names):
         """
         Create in-memory buffers.
@@ -6,12 +6,7 @@ import logging
 
 from django.db import DatabaseError
 
-from openassessment.assessment.api import peer as peer_api
-from openassessment.assessment.api import ai as ai_api
-from openassessment.assessment.api import student_training as training_api
-from openassessment.assessment.errors import (
-    PeerAssessmentError, StudentTrainingInternalError, AIError
-)
+from openassessment.assessment.errors import PeerAssessmentError
 from submissions import api as sub_api
 from .models import AssessmentWorkflow, AssessmentWorkflowStep
 from .serializers import AssessmentWorkflowSerializer
@@ -23,7 +18,7 @@ from .errors import (
 logger = logging.getLogger(__name__)
 
 
-def create_workflow(submission_uuid, steps, on_init_params=None):
+def create_workflow(submission_uuid, steps, on_init_params=None, student_item_dict=None):
     """Begins a new assessment workflow.
 
     Create a new workflow that other assessments will record themselves against.
@@ -37,6 +32,10 @@ def create_workflow(submission_uuid, steps, on_init_params=None):
     Keyword Arguments:
         on_init_params (dict): The parameters to pass to each assessment module
             on init.  Keys are the assessment step names.
+        student_item_dict (dict): The student item for the submission, with
+            keys `student_id`, `course_id`, `item_id`, and `item_type`.
+            Callers that just created the submission can pass this in to
+            save us from retrieving the submission again.
 
     Returns:
         dict: Assessment workflow information with the following
@@ -71,7 +70,10 @@ def create_workflow(submission_uuid, steps, on_init_params=None):
         on_init_params = dict()
 
     try:
-        workflow = AssessmentWorkflow.start_workflow(submission_uuid, steps, on_init_params)
+        workflow = AssessmentWorkflow.start_workflow(
+            submission_uuid, steps, on_init_params,
+            student_item_dict=student_item_dict
+        )
         logger.info((
             u"Started assessment workflow for "
             u"submission UUID {uuid} with steps {steps}"
@@ -346,7 +348,9 @@ def _get_workflow_model(submission_uuid):
         raise AssessmentWorkflowRequestError("submission_uuid must be a string type")
 
     try:
-        workflow = AssessmentWorkflow.objects.get(submission_uuid=submission_uuid)
+        # Load the steps along with the workflow, since updating the workflow
+        # and reporting its status details both need them.
+        workflow = AssessmentWorkflow.objects.prefetch_related('steps').get(submission_uuid=submission_uuid)
     except AssessmentWorkflow.DoesNotExist:
         raise AssessmentWorkflowNotFoundError(
             u"No assessment workflow matching submission_uuid {}".format(submission_uuid)
@@ -11,10 +11,13 @@ need to then generate a matching migration for it using:
 """
 import logging
 import importlib
+from collections import defaultdict
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction, DatabaseError
 from django.dispatch import receiver
 from django_extensions.db.fields import UUIDField
+from django.utils.functional import cached_property
 from django.utils.timezone import now
 from model_utils import Choices
 from model_utils.models import StatusModel, TimeStampedModel
@@ -56,6 +59,22 @@ ASSESSMENT_SCORE_PRIORITY = getattr(
 )
 
 
+# Stand-ins for functions an assessment API may choose not to define.
+# A single shared function is used for each, rather than a new lambda per call.
+def _assume_finished(submission_uuid, requirements):
+    """
+    An API without a completion check never holds up the workflow.
+    """
+    return True
+
+
+def _ignore_event(submission_uuid, **params):
+    """
+    An API without an event hook has nothing to do.
+    """
+    return None
+
+
 class AssessmentWorkflow(TimeStampedModel, StatusModel):
     """Tracks the open-ended assessment status of a student submission.
 
@@ -69,7 +88,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
     an after the fact recording of the last known state of that information so
     we can search easily.
     """
-    STEPS = ASSESSMENT_API_DICT.keys()
+    STEPS = tuple(ASSESSMENT_API_DICT.keys())
 
     STATUSES = [
         "waiting",  # User has done all necessary assessment but hasn't been
@@ -78,7 +97,7 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         "done",  # Complete
     ]
 
-    STATUS_VALUES = STEPS + STATUSES
+    STATUS_VALUES = STEPS + tuple(STATUSES)
 
     STATUS = Choices(*STATUS_VALUES)  # implicit "status" field
 
@@ -94,11 +113,13 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
 
     class Meta:
         ordering = ["-created"]
-        # TODO: In migration, need a non-unique index on (course_id, item_id, status)
+        # There is also a non-unique index on (course_id, item_id, status),
+        # used to count workflows by status.  Django 1.4 can't declare
+        # multi-column indexes here, so it's created by migration 0002.
 
     @classmethod
     @transaction.commit_on_success
-    def start_workflow(cls, submission_uuid, step_names, on_init_params):
+    def start_workflow(cls, submission_uuid, step_names, on_init_params, student_item_dict=None):
         """
         Start a new workflow.
 
@@ -108,6 +129,11 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             on_init_params (dict): The parameters to pass to each assessment module
                 on init.  Keys are the assessment step names.
 
+        Keyword Arguments:
+            student_item_dict (dict): The student item of the submission, if the
+                caller already has it.  If not provided, we retrieve it
+                from the submissions API.
+
         Returns:
             AssessmentWorkflow
 
@@ -118,50 +144,52 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             DatabaseError
             Assessment-module specific errors
         """
-        submission_dict = sub_api.get_submission_and_student(submission_uuid)
+        if student_item_dict is None:
+            submission_dict = sub_api.get_submission_and_student(submission_uuid)
+            student_item_dict = submission_dict['student_item']
+
+        workflow_steps = [
+            AssessmentWorkflowStep(name=step, order_num=i)
+            for i, step in enumerate(step_names)
+        ]
+
+        # The workflow starts in the first step that has an assessment API.
+        # If there is no such step, the submitter has nothing to do,
+        # so we start out waiting.
+        first_step = next(
+            (step for step in workflow_steps if step.api() is not None), None
+        )
+        if first_step is not None:
+            status = first_step.name
+        else:
+            status = AssessmentWorkflow.STATUS.waiting
 
         # Create the workflow and step models in the database
-        # For now, set the status to waiting; we'll modify it later
-        # based on the first step in the workflow.
         workflow = cls.objects.create(
             submission_uuid=submission_uuid,
-            status=AssessmentWorkflow.STATUS.waiting,
-            course_id=submission_dict['student_item']['course_id'],
-            item_id=submission_dict['student_item']['item_id']
+            status=status,
+            course_id=student_item_dict['course_id'],
+            item_id=student_item_dict['item_id']
         )
-        workflow_steps = [
-            AssessmentWorkflowStep(
-                workflow=workflow, name=step, order_num=i
-            )
-            for i, step in enumerate(step_names)
-        ]
-        workflow.steps.add(*workflow_steps)
+        for step in workflow_steps:
+            step.workflow = workflow
+        AssessmentWorkflowStep.objects.bulk_create(workflow_steps)
 
         # Initialize the assessment APIs
-        has_started_first_step = False
         for step in workflow_steps:
             api = step.api()
 
             if api is not None:
                 # Initialize the assessment module
                 # We do this for every assessment module
-                on_init_func = getattr(api, 'on_init', lambda submission_uuid, **params: None)
+                on_init_func = getattr(api, 'on_init', _ignore_event)
                 on_init_func(submission_uuid, **on_init_params.get(step.name, {}))
 
-                # For the first valid step, update the workflow status
-                # and notify the assessment module that it's being started
-                if not has_started_first_step:
-                    # Update the workflow
-                    workflow.status = step.name
-                    workflow.save()
-
-                    # Notify the assessment module that it's being started
-                    on_start_func = getattr(api, 'on_start', lambda submission_uuid: None)
+                # Notify the assessment module for the first step that it's being started
+                if step is first_step:
+                    on_start_func = getattr(api, 'on_start', _ignore_event)
                     on_start_func(submission_uuid)
 
-                    # Remember that we've already started the first step
-                    has_started_first_step = True
-
         # Update the workflow (in case some of the assessment modules are automatically complete)
         # We do NOT pass in requirements, on the assumption that any assessment module
         # that accepts requirements would NOT automatically complete.
@@ -170,12 +198,15 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         # Return the newly created workflow
         return workflow
 
-    @property
+    @cached_property
     def score(self):
         """Latest score for the submission we're tracking.
 
         Note that while it is usually the case that we're setting the score,
         that may not always be the case. We may have some course staff override.
+
+        The score is retrieved once per workflow instance;
+        `set_score()` clears the cached value.
         """
         return sub_api.get_latest_score_for_submission(self.submission_uuid)
 
@@ -190,18 +221,13 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                 # met the requirements.  This prevents students from getting "stuck"
                 # in the workflow in the event of a rollback that removes a step
                 # from the problem definition.
-                submitter_finished_func = getattr(api, 'submitter_is_finished', lambda submission_uuid, reqs: True)
-                assessment_finished_func = getattr(api, 'assessment_is_finished', lambda submission_uuid, reqs: True)
+                submitter_finished_func = getattr(api, 'submitter_is_finished', _assume_finished)
+                assessment_finished_func = getattr(api, 'assessment_is_finished', _assume_finished)
+                step_reqs = assessment_requirements.get(step.name, {})
 
                 status_dict[step.name] = {
-                    "complete": submitter_finished_func(
-                        self.submission_uuid,
-                        assessment_requirements.get(step.name, {})
-                    ),
-                    "graded": assessment_finished_func(
-                        self.submission_uuid,
-                        assessment_requirements.get(step.name, {})
-                    ),
+                    "complete": submitter_finished_func(self.submission_uuid, step_reqs),
+                    "graded": assessment_finished_func(self.submission_uuid, step_reqs),
                 }
         return status_dict
 
@@ -248,9 +274,14 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         steps = self._get_steps()
         step_for_name = {step.name:step for step in steps}
 
-        # Go through each step and update its status.
-        for step in steps:
-            step.update(self.submission_uuid, assessment_requirements)
+        # Go through each step and update its status,
+        # then write all the changes to the database at once.
+        # Everything that changes during this update is stamped with the same time.
+        updated_at = now()
+        AssessmentWorkflowStep.save_completed_times([
+            (step, step.update(self.submission_uuid, assessment_requirements, at=updated_at))
+            for step in steps
+        ])
 
         # Fetch name of the first step that the submitter hasn't yet completed.
         new_status = next(
@@ -259,9 +290,11 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         )
 
         # If the submitter is beginning the next assessment, notify the
-        # appropriate assessment API.
+        # appropriate assessment API.  The step was already started when we
+        # moved into it, so there's no need to notify the API again while the
+        # submitter is still working on it.
         new_step = step_for_name.get(new_status)
-        if new_step is not None:
+        if new_step is not None and new_status != self.status:
             on_start_func = getattr(new_step.api(), 'on_start', None)
             if on_start_func is not None:
                 on_start_func(self.submission_uuid)
@@ -299,10 +332,16 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
                 self.set_score(score)
                 new_status = self.STATUS.done
 
-        # Finally save our changes if the status has changed
+        # Finally save our changes if the status has changed.
+        # Only the status (and the timestamps that track it) can change here,
+        # so update just those columns instead of re-saving the whole row.
         if self.status != new_status:
             self.status = new_status
-            self.save()
+            self.status_changed = updated_at
+            self.modified = updated_at
+            AssessmentWorkflow.objects.filter(pk=self.pk).update(
+                status=new_status, status_changed=updated_at, modified=updated_at
+            )
             logger.info((
                 u"Workflow for submission UUID {uuid} has updated status to {status}"
             ).format(uuid=self.submission_uuid, status=new_status))
@@ -313,14 +352,21 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
         Workflow.
         """
         # Do not return steps that are not recognized in the AssessmentWorkflow.
-        steps = list(self.steps.filter(name__in=AssessmentWorkflow.STEPS))
+        # We filter in Python rather than in the query so that steps
+        # prefetched along with the workflow (`prefetch_related('steps')`)
+        # are used without going back to the database.
+        steps = [step for step in self.steps.all() if step.name in AssessmentWorkflow.STEPS]
         if not steps:
             # If no steps exist for this AssessmentWorkflow, assume
-            # peer -> self for backwards compatibility
-            self.steps.add(
-                AssessmentWorkflowStep(name=self.STATUS.peer, order_num=0),
-                AssessmentWorkflowStep(name=self.STATUS.self, order_num=1)
-            )
+            # peer -> self for backwards compatibility.
+            # Both steps are inserted at once; since `bulk_create()` doesn't
+            # set their primary keys, we query the saved steps afterwards.
+            AssessmentWorkflowStep.objects.bulk_create([
+                AssessmentWorkflowStep(workflow=self, name=self.STATUS.peer, order_num=0),
+                AssessmentWorkflowStep(workflow=self, name=self.STATUS.self, order_num=1),
+            ])
+            # Discard any (now stale) prefetched steps before querying again
+            getattr(self, '_prefetched_objects_cache', {}).pop('steps', None)
             steps = list(self.steps.all())
         return steps
 
@@ -342,6 +388,9 @@ class AssessmentWorkflow(TimeStampedModel, StatusModel):
             score["points_possible"]
         )
 
+        # Clear the cached score so we retrieve the new one
+        self.__dict__.pop('score', None)
+
 
 class AssessmentWorkflowStep(models.Model):
     """An individual step in the overall workflow process.
@@ -375,7 +424,23 @@ class AssessmentWorkflowStep(models.Model):
         associated with this workflow step, None is returned.
 
         This relies on Django settings to map step names to
-        the assessment API implementation.
+        the assessment API implementation.  The API is resolved the first
+        time it's requested and then cached on the step, since a workflow
+        update asks each step for its API several times.
+        """
+        if '_api' not in self.__dict__:
+            self._api = self._load_api()
+        return self._api
+
+    def _load_api(self):
+        """
+        Look up and import the API module for this step.
+
+        Returns:
+            module or None
+
+        Raises:
+            AssessmentApiLoadError
         """
         # We retrieve the settings in-line here (rather than using the
         # top-level constant), so that @override_settings will work
@@ -399,37 +464,75 @@ class AssessmentWorkflowStep(models.Model):
             logger.warning(msg)
             return None
 
-    def update(self, submission_uuid, assessment_requirements):
+    def update(self, submission_uuid, assessment_requirements, at=None):
         """
         Updates the AssessmentWorkflowStep models with the requirements
         specified from the Workflow API.
 
         Intended for internal use by update_from_assessments(). See
         update_from_assessments() documentation for more details.
+
+        The changes are made in memory only; use `save_completed_times()`
+        to write them to the database.
+
+        Keyword Arguments:
+            at (datetime): The time to record for any newly completed parts
+                of the step.  Defaults to the current time.
+
+        Returns:
+            list of the names of the fields that changed
+
         """
         # Once a step is completed, it will not be revisited based on updated requirements.
-        step_changed = False
+        changed_fields = []
         if assessment_requirements is None:
             step_reqs = None
         else:
             step_reqs = assessment_requirements.get(self.name, {})
 
-        default_finished = lambda submission_uuid, step_reqs: True
-        submitter_finished = getattr(self.api(), 'submitter_is_finished', default_finished)
-        assessment_finished = getattr(self.api(), 'assessment_is_finished', default_finished)
+        if at is None:
+            at = now()
+
+        api = self.api()
+        submitter_finished = getattr(api, 'submitter_is_finished', _assume_finished)
+        assessment_finished = getattr(api, 'assessment_is_finished', _assume_finished)
 
         # Has the user completed their obligations for this step?
         if (not self.is_submitter_complete() and submitter_finished(submission_uuid, step_reqs)):
-            self.submitter_completed_at = now()
-            step_changed = True
+            self.submitter_completed_at = at
+            changed_fields.append('submitter_completed_at')
 
         # Has the step received a score?
         if (not self.is_assessment_complete() and assessment_finished(submission_uuid, step_reqs)):
-            self.assessment_completed_at = now()
-            step_changed = True
+            self.assessment_completed_at = at
+            changed_fields.append('assessment_completed_at')
+
+        return changed_fields
 
-        if step_changed:
-            self.save()
+    @classmethod
+    def save_completed_times(cls, changed_fields_by_step):
+        """
+        Write updated completion timestamps for several steps to the database.
+
+        Rather than saving each step, this issues one UPDATE for each
+        distinct (field, timestamp) pair, so steps completed at the same
+        time are written together.
+
+        Args:
+            changed_fields_by_step (list): List of `(step, changed_fields)` tuples,
+                where `changed_fields` is the list returned by `step.update()`.
+
+        Returns:
+            None
+
+        """
+        pks_by_update = defaultdict(list)
+        for step, changed_fields in changed_fields_by_step:
+            for field_name in changed_fields:
+                pks_by_update[(field_name, getattr(step, field_name))].append(step.pk)
+
+        for (field_name, value), pks in pks_by_update.iteritems():
+            cls.objects.filter(pk__in=pks).update(**{field_name: value})
 
 
 @receiver(assessment_complete_signal)
@@ -454,19 +557,30 @@ def update_workflow_async(sender, **kwargs):
         logger.error("Update workflow signal called without a submission UUID")
         return
 
+    # Once a workflow is done it never changes again, so if we've already
+    # seen it finish, repeated signals for it don't need to touch the database.
+    done_cache_key = u"openassessment.workflow.done.{uuid}".format(uuid=submission_uuid)
+    if cache.get(done_cache_key):
+        return
+
     try:
-        workflow = AssessmentWorkflow.objects.get(submission_uuid=submission_uuid)
+        workflow = AssessmentWorkflow.objects.prefetch_related('steps').get(submission_uuid=submission_uuid)
         workflow.update_from_assessments(None)
+
+        if workflow.status == AssessmentWorkflow.STATUS.done:
+            cache.set(done_cache_key, True)
     except AssessmentWorkflow.DoesNotExist:
+        # This is expected if the submission has no workflow yet,
+        # so there's no need to log a traceback.
         msg = u"Could not retrieve workflow for submission with UUID {}".format(submission_uuid)
-        logger.exception(msg)
+        logger.warning(msg)
     except DatabaseError:
         msg = (
             u"Database error occurred while updating "
             u"the workflow for submission UUID {}"
         ).format(submission_uuid)
         logger.exception(msg)
-    except:
+    except Exception:
         msg = (
             u"Unexpected error occurred while updating the workflow "
             u"for submission UUID {}"
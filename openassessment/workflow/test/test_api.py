@@ -85,6 +85,24 @@ class TestAssessmentWorkflowApi(CacheResetTest):
             peer_workflows = list(PeerWorkflow.objects.filter(submission_uuid=submission["uuid"]))
             self.assertFalse(peer_workflows)
 
+    def test_create_workflow_with_student_item(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+
+        # If we already have the student item, we shouldn't need to
+        # retrieve the submission again to create the workflow.
+        with patch.object(sub_api, 'get_submission_and_student') as mock_get:
+            workflow = workflow_api.create_workflow(
+                submission["uuid"], ["self"], student_item_dict=ITEM_1
+            )
+            self.assertFalse(mock_get.called)
+
+        self.assertEqual(workflow["submission_uuid"], submission["uuid"])
+        self.assertEqual(workflow["status"], "self")
+
+        workflow_model = AssessmentWorkflow.objects.get(submission_uuid=submission["uuid"])
+        self.assertEqual(workflow_model.course_id, ITEM_1["course_id"])
+        self.assertEqual(workflow_model.item_id, ITEM_1["item_id"])
+
     def test_assessment_module_rollback_update_workflow(self):
         """
         Test that updates work when assessment modules roll back
@@ -107,7 +125,7 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         # otherwise the creation logic will not allow unknown an unknown status
         # to be set.
         real_steps = AssessmentWorkflow.STEPS
-        AssessmentWorkflow.STEPS = ["special"] + real_steps
+        AssessmentWorkflow.STEPS = ("special",) + real_steps
         workflow, submission = self._create_workflow_with_status(
             "user 1",
             "test/1/1",
@@ -180,6 +198,23 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         peer_workflow = PeerWorkflow.objects.get(submission_uuid=submission["uuid"])
         self.assertIsNotNone(peer_workflow)
 
+    def test_update_does_not_restart_current_step(self):
+        submission = sub_api.create_submission(ITEM_1, "Shoot Hot Rod")
+        workflow_api.create_workflow(submission["uuid"], ["peer", "self"], ON_INIT_PARAMS)
+        requirements = {
+            "peer": {
+                "must_grade": 5,
+                "must_be_graded_by": 3
+            }
+        }
+
+        # The submitter is still working on peer assessment, so the
+        # peer API shouldn't be told that the step is starting again.
+        with patch.object(peer_api, 'on_start') as mock_on_start:
+            workflow = workflow_api.update_from_assessments(submission["uuid"], requirements)
+        self.assertEqual(workflow["status"], "peer")
+        self.assertFalse(mock_on_start.called)
+
     @ddt.file_data('data/assessments.json')
     def test_need_valid_submission_uuid(self, data):
         # submission doesn't exist
@@ -244,7 +279,7 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         submission = sub_api.create_submission(ITEM_1, "Ultra Magnus fumble")
         workflow_api.create_workflow(submission["uuid"], ["peer", "self"], ON_INIT_PARAMS)
 
-    @patch.object(AssessmentWorkflow.objects, 'get')
+    @patch.object(AssessmentWorkflow.objects, 'prefetch_related')
     @ddt.file_data('data/assessments.json')
     @raises(workflow_api.AssessmentWorkflowInternalError)
     def test_unexpected_exception_wrapped(self, data, mock_create):
@@ -336,7 +371,6 @@ class TestAssessmentWorkflowApi(CacheResetTest):
         )
         self.assertEqual(counts, updated_counts)
 
-    @override_settings(ORA2_ASSESSMENTS={'self': 'not.a.module'})
     def test_unable_to_load_api(self):
         submission = sub_api.create_submission({
             "student_id": "test student",
@@ -345,11 +379,20 @@ class TestAssessmentWorkflowApi(CacheResetTest):
             "item_type": "openassessment",
         }, "test answer")
 
-        with self.assertRaises(AssessmentWorkflowInternalError):
-            workflow_api.create_workflow(submission['uuid'], ['self'], ON_INIT_PARAMS)
+        # If we can't load an API, we shouldn't create the workflow at all
+        with override_settings(ORA2_ASSESSMENTS={'self': 'not.a.module'}):
+            with self.assertRaises(AssessmentWorkflowInternalError):
+                workflow_api.create_workflow(submission['uuid'], ['self'], ON_INIT_PARAMS)
+        self.assertFalse(
+            AssessmentWorkflow.objects.filter(submission_uuid=submission['uuid']).exists()
+        )
 
-        with self.assertRaises(AssessmentWorkflowInternalError):
-            workflow_api.update_from_assessments(submission['uuid'], {})
+        # Create the workflow while the API is configured correctly,
+        # then expect updates to fail once it can no longer be loaded.
+        workflow_api.create_workflow(submission['uuid'], ['self'], ON_INIT_PARAMS)
+        with override_settings(ORA2_ASSESSMENTS={'self': 'not.a.module'}):
+            with self.assertRaises(AssessmentWorkflowInternalError):
+                workflow_api.update_from_assessments(submission['uuid'], {})
 
     def _create_workflow_with_status(
         self, student_id, course_id, item_id,
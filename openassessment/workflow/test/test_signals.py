@@ -53,8 +53,21 @@ class UpdateWorkflowSignalTest(CacheResetTest):
             # Verify that the workflow model update was called
             mock_update.assert_called_once_with(None)
 
+    def test_update_signal_skips_done_workflow(self):
+        # Start a workflow for the submission and mark it done
+        workflow_api.create_workflow(self.submission_uuid, ['self'])
+        AssessmentWorkflow.objects.filter(submission_uuid=self.submission_uuid).update(status='done')
+
+        # The first signal retrieves the workflow and sees that it's done
+        assessment_complete_signal.send(sender=None, submission_uuid=self.submission_uuid)
+
+        # Later signals shouldn't need to retrieve the workflow at all
+        with mock.patch.object(AssessmentWorkflow.objects, 'prefetch_related') as mock_get:
+            assessment_complete_signal.send(sender=None, submission_uuid=self.submission_uuid)
+            self.assertFalse(mock_get.called)
+
     @ddt.data(DatabaseError, IOError)
-    @mock.patch.object(AssessmentWorkflow.objects, 'get')
+    @mock.patch.object(AssessmentWorkflow.objects, 'prefetch_related')
     def test_errors(self, error, mock_call):
         # Start a workflow for the submission
         workflow_api.create_workflow(self.submission_uuid, ['self'])
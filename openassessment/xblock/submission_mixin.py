@@ -157,7 +157,7 @@ class SubmissionMixin(object):
         if self.allow_file_upload:
             student_sub_dict['file_key'] = self._get_student_item_key()
         submission = api.create_submission(student_item_dict, student_sub_dict)
-        self.create_workflow(submission["uuid"])
+        self.create_workflow(submission["uuid"], student_item_dict=student_item_dict)
         self.submission_uuid = submission["uuid"]
 
         # Emit analytics event...
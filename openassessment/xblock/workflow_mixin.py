@@ -38,7 +38,7 @@ class WorkflowMixin(object):
         """
         return self.get_workflow_info()
 
-    def create_workflow(self, submission_uuid):
+    def create_workflow(self, submission_uuid, student_item_dict=None):
         """
         Create a new workflow for a student submission.
 
@@ -46,6 +46,9 @@ class WorkflowMixin(object):
             submission_uuid (str): The UUID of the submission to associate
                 with the workflow.
 
+        Keyword Arguments:
+            student_item_dict (dict): The student item of the submission, if known.
+
         Returns:
             None
 
@@ -58,7 +61,11 @@ class WorkflowMixin(object):
                 'algorithm_id': ai_module["algorithm_id"] if ai_module else None
             }
         }
-        workflow_api.create_workflow(submission_uuid, steps, on_init_params=on_init_params)
+        workflow_api.create_workflow(
+            submission_uuid, steps,
+            on_init_params=on_init_params,
+            student_item_dict=student_item_dict
+        )
 
     def workflow_requirements(self):
         """
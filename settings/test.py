@@ -21,20 +21,24 @@ NOSE_ARGS = [
     '--cover-erase',
     ]
 
+# Run the test suite against an in-memory SQLite database.
+# An in-memory database lives only as long as its connection, so a
+# "read_replica" mirror would see an empty database rather than the default
+# one; we omit it here and let the read replica code fall back to "default".
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': 'test_ora2db',
-        'TEST_NAME': 'test_ora2db',
-    },
-    'read_replica': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'TEST_MIRROR': 'default',
+        'TEST_NAME': ':memory:',
     },
 }
 
 TEST_RUNNER = 'django_nose.NoseTestSuiteRunner'
 
+# Build the test database directly from the models (syncdb)
+# instead of replaying every South migration.
+SOUTH_TESTS_MIGRATE = False
+
 # Install test-specific Django apps
 INSTALLED_APPS += ('django_nose',)
 